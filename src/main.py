@@ -1,10 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from storage_api_proxy.api.endpoints import router
+from storage_api_proxy.api.endpoints import router, db
 from storage_api_proxy.core.config import get_settings
 from storage_api_proxy.core.logging import setup_logging
-from storage_api_proxy.services.database import WorkspaceDatabase
+from storage_api_proxy.services.workspace_manager import WorkspaceManager
 
 # Setup logging
 setup_logging()
@@ -16,9 +16,6 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Create database instance
-db = WorkspaceDatabase()
-
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -37,11 +34,16 @@ async def startup_event():
     """Initialize application resources on startup."""
     settings = get_settings()
     
-    # Initialize database
+    # Initialize credential store
     await db.initialize()
 
+    # Shared workspace manager, created here so its locks and HTTP client
+    # belong to the server's event loop
+    app.state.workspace_manager = WorkspaceManager(db)
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup application resources on shutdown."""
+    await app.state.workspace_manager.close()
     await db.close() 
\ No newline at end of file
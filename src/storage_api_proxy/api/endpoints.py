@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import JSONResponse
 from typing import Optional
+import math
 
 from ..core.config import get_settings, Settings
 from ..schemas.models import QueryRequest, QueryResponse
-from ..services.workspace_manager import WorkspaceManager
+from ..services.workspace_manager import WorkspaceManager, WorkspaceProvisioning
 from ..services.query_executor import execute_query
-from ..services.database import WorkspaceDatabase
+from ..services.query_coalescer import QueryCoalescer
+from ..services.credential_store import create_credential_store
 
 router = APIRouter()
-db = WorkspaceDatabase()
+db = create_credential_store(get_settings())
+query_coalescer = QueryCoalescer()
 
 
 async def get_storage_token(
@@ -23,13 +27,60 @@ async def get_storage_token(
     return x_storageapi_token
 
 
-def get_workspace_manager() -> WorkspaceManager:
-    """Get the workspace manager instance."""
-    return WorkspaceManager(db)
+def get_workspace_manager(request: Request) -> WorkspaceManager:
+    """Get the workspace manager instance created on application startup."""
+    return request.app.state.workspace_manager
+
+
+def provisioning_response(request: Request, status: dict) -> JSONResponse:
+    """Build a 202 response pointing the client to the workspace status URL."""
+    status_url = str(request.url_for("get_workspace_status"))
+    retry_after = max(1, math.ceil(get_settings().workspace_job_poll_interval))
+    return JSONResponse(
+        status_code=202,
+        content={**status, "status_url": status_url},
+        headers={"Location": status_url, "Retry-After": str(retry_after)}
+    )
+
+
+async def execute_with_password_reset(
+    workspace_manager: WorkspaceManager,
+    workspace_data: dict,
+    storage_token: str,
+    query: str
+) -> dict:
+    """Execute a query, resetting the workspace password once if credentials are stale."""
+    try:
+        return await execute_query(workspace_data["credentials"], query)
+    except Exception as e:
+        error_str = str(e).lower()
+        if "incorrect username or password" not in error_str and "is empty" not in error_str:
+            raise
+    try:
+        # Reset password and update credentials
+        new_password = await workspace_manager.api_client.reset_password(
+            workspace_data["workspace_id"], 
+            storage_token
+        )
+        # Update credentials in database with new password
+        new_credentials = {**workspace_data["credentials"], "password": new_password}
+        await workspace_manager.db.store_credentials(
+            workspace_data["workspace_name"],
+            workspace_data["workspace_id"], 
+            new_credentials
+        )
+        # Retry query with new credentials
+        return await execute_query(new_credentials, query)
+    except Exception as retry_error:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Query execution failed even after password reset: {str(retry_error)}"
+        )
 
 
 @router.post("/query", response_model=QueryResponse)
 async def run_query(
+    request: Request,
     query_request: QueryRequest,
     storage_token: str = Depends(get_storage_token),
     workspace_manager: WorkspaceManager = Depends(get_workspace_manager),
@@ -38,6 +89,11 @@ async def run_query(
     """Execute a SQL query in a Snowflake workspace."""
     try:
         workspace_data = await workspace_manager.get_or_create_workspace(storage_token)
+    except WorkspaceProvisioning as e:
+        return provisioning_response(
+            request,
+            {"workspace_name": e.workspace_name, "job_id": e.job_id, "status": "processing"}
+        )
     except Exception as e:
         if "Failed to verify token" in str(e):
             raise HTTPException(
@@ -60,34 +116,16 @@ async def run_query(
         )
 
     try:
-        result = await execute_query(
-            workspace_data["credentials"], 
-            query_request.query
+        result = await query_coalescer.run(
+            workspace_data["workspace_name"],
+            query_request.query,
+            lambda: execute_with_password_reset(workspace_manager, workspace_data, storage_token, query_request.query)
         )
+    except HTTPException:
+        raise
     except Exception as e:
         error_str = str(e).lower()
-        if "incorrect username or password" in error_str or "is empty" in error_str:
-            try:
-                # Reset password and update credentials
-                new_password = await workspace_manager.api_client.reset_password(
-                    workspace_data["workspace_id"], 
-                    storage_token
-                )
-                # Update credentials in database with new password
-                new_credentials = {**workspace_data["credentials"], "password": new_password}
-                await workspace_manager.db.store_credentials(
-                    workspace_data["workspace_name"],
-                    workspace_data["workspace_id"], 
-                    new_credentials
-                )
-                # Retry query with new credentials
-                result = await execute_query(new_credentials, query_request.query)
-            except Exception as retry_error:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Query execution failed even after password reset: {str(retry_error)}"
-                )
-        elif "syntax error" in error_str:
+        if "syntax error" in error_str:
             raise HTTPException(
                 status_code=400,
                 detail=f"SQL syntax error: {str(e)}"
@@ -117,12 +155,18 @@ async def run_query(
 
 @router.post("/workspace")
 async def create_workspace(
+    request: Request,
     storage_token: str = Depends(get_storage_token),
     workspace_manager: WorkspaceManager = Depends(get_workspace_manager)
 ):
     """Create or get existing workspace."""
     try:
         return await workspace_manager.get_or_create_workspace(storage_token)
+    except WorkspaceProvisioning as e:
+        return provisioning_response(
+            request,
+            {"workspace_name": e.workspace_name, "job_id": e.job_id, "status": "processing"}
+        )
     except Exception as e:
         if "Failed to verify token" in str(e):
             raise HTTPException(
@@ -142,4 +186,40 @@ async def create_workspace(
         raise HTTPException(
             status_code=500,
             detail=f"Workspace error: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+
+@router.get("/query/stats")
+async def query_stats():
+    """Get counters of executed and coalesced queries."""
+    return query_coalescer.stats()
+
+
+@router.get("/workspace/status")
+async def get_workspace_status(
+    request: Request,
+    storage_token: str = Depends(get_storage_token),
+    workspace_manager: WorkspaceManager = Depends(get_workspace_manager)
+):
+    """Get provisioning status of the workspace."""
+    try:
+        status = await workspace_manager.get_workspace_status(storage_token)
+    except Exception as e:
+        if "Failed to verify token" in str(e):
+            raise HTTPException(
+                status_code=401,
+                detail="Invalid Storage API token"
+            )
+        raise HTTPException(
+            status_code=500,
+            detail=f"Workspace error: {str(e)}"
+        )
+
+    if status["status"] == "not_found":
+        raise HTTPException(
+            status_code=404,
+            detail="Workspace not found. Create it with POST /workspace."
+        )
+    if status["status"] == "processing":
+        return provisioning_response(request, status)
+    return status
\ No newline at end of file
@@ -11,7 +11,17 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
 
     # Database Configuration
-    db_path: str = "data/credentials.db"
+    credential_store: str = "sqlite"  # sqlite, memory or redis
+    db_path: str = "data/workspaces.db"
+    redis_url: str = "redis://localhost:6379/0"
+    redis_key_prefix: str = "storage_api_proxy:credentials:"
+    token_cache_ttl: int = 0  # seconds a verified token maps to its workspace, 0 disables
+    redis_timeout: float = 5.0  # seconds for connecting to and each reply from Redis
+
+    # Workspace Provisioning Configuration
+    workspace_job_poll_interval: float = 1.0  # seconds between Storage API job polls
+    workspace_job_timeout: int = 600  # seconds before a creation job is considered failed
+    workspace_provisioning_wait: float = 10.0  # seconds a request waits before answering 202
 
     # Server Configuration
     host: str = "0.0.0.0"
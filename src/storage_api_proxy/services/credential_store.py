@@ -0,0 +1,301 @@
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import unquote, urlparse
+
+from ..core.config import Settings
+
+
+class CredentialStore(ABC):
+    """Interface for workspace credential caches"""
+
+    async def initialize(self):
+        """Prepare the backend for use"""
+
+    @abstractmethod
+    async def get_credentials(self, workspace_name: str) -> Optional[dict]:
+        """Return {"id", "credentials"} for a workspace or None if not cached"""
+
+    @abstractmethod
+    async def store_credentials(self, workspace_name: str, workspace_id: str, credentials: dict):
+        """Store (or replace) credentials for a workspace"""
+
+    @abstractmethod
+    async def get_provisioning(self, workspace_name: str) -> Optional[dict]:
+        """Return {"job_id", "status", "error"} of a workspace creation job or None"""
+
+    @abstractmethod
+    async def store_provisioning(self, workspace_name: str, job_id: str, status: str, error: Optional[str] = None):
+        """Store (or replace) the state of a workspace creation job"""
+
+    @abstractmethod
+    async def delete_provisioning(self, workspace_name: str):
+        """Forget the workspace creation job of a workspace"""
+
+    @abstractmethod
+    async def get_token_workspace(self, token_hash: str) -> Optional[str]:
+        """Return the workspace name of a verified token hash or None if unknown or expired"""
+
+    @abstractmethod
+    async def store_token_workspace(self, token_hash: str, workspace_name: str, ttl_seconds: int):
+        """Remember the workspace name of a verified token hash for ttl_seconds"""
+
+    async def close(self):
+        """Release backend resources"""
+
+
+class InMemoryCredentialStore(CredentialStore):
+    """Process-local credential cache, lost on restart"""
+
+    def __init__(self):
+        self._entries: Dict[str, dict] = {}
+        self._provisioning: Dict[str, dict] = {}
+        self._token_workspaces: Dict[str, Tuple[str, float]] = {}
+
+    async def get_credentials(self, workspace_name: str) -> Optional[dict]:
+        entry = self._entries.get(workspace_name)
+        if not entry:
+            return None
+        return {
+            "id": entry["id"],
+            "credentials": dict(entry["credentials"])
+        }
+
+    async def store_credentials(self, workspace_name: str, workspace_id: str, credentials: dict):
+        self._entries[workspace_name] = {
+            "id": workspace_id,
+            "credentials": dict(credentials),
+            "updated_at": datetime.utcnow()
+        }
+
+    async def get_provisioning(self, workspace_name: str) -> Optional[dict]:
+        entry = self._provisioning.get(workspace_name)
+        if not entry:
+            return None
+        return {
+            "job_id": entry["job_id"],
+            "status": entry["status"],
+            "error": entry["error"]
+        }
+
+    async def store_provisioning(self, workspace_name: str, job_id: str, status: str, error: Optional[str] = None):
+        self._provisioning[workspace_name] = {
+            "job_id": job_id,
+            "status": status,
+            "error": error,
+            "updated_at": datetime.utcnow()
+        }
+
+    async def delete_provisioning(self, workspace_name: str):
+        self._provisioning.pop(workspace_name, None)
+
+    async def get_token_workspace(self, token_hash: str) -> Optional[str]:
+        entry = self._token_workspaces.get(token_hash)
+        if not entry:
+            return None
+        workspace_name, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._token_workspaces[token_hash]
+            return None
+        return workspace_name
+
+    async def store_token_workspace(self, token_hash: str, workspace_name: str, ttl_seconds: int):
+        now = time.monotonic()
+        # Every token has its own hash, drop expired ones so the map does not grow forever
+        expired = [key for key, (_, expires_at) in self._token_workspaces.items() if now >= expires_at]
+        for key in expired:
+            del self._token_workspaces[key]
+        self._token_workspaces[token_hash] = (workspace_name, now + ttl_seconds)
+
+    async def close(self):
+        self._entries.clear()
+        self._provisioning.clear()
+        self._token_workspaces.clear()
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisCredentialStore(CredentialStore):
+    """
+    Credential cache shared between instances through a Redis-protocol server.
+    Speaks the minimal subset of RESP needed for GET/SET/DEL over a single connection.
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        key_prefix: str = "storage_api_proxy:credentials:",
+        timeout: float = 5.0
+    ):
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported Redis URL scheme: {parsed.scheme}")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.password = unquote(parsed.password) if parsed.password else None
+        path = parsed.path.lstrip("/")
+        self.db = int(path) if path else 0
+        self.key_prefix = key_prefix
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        # Created on first use so it binds to the server's event loop, not the import-time one
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _key(self, workspace_name: str) -> str:
+        return f"{self.key_prefix}{workspace_name}"
+
+    def _provisioning_key(self, workspace_name: str) -> str:
+        return f"{self.key_prefix}provisioning:{workspace_name}"
+
+    def _token_key(self, token_hash: str) -> str:
+        return f"{self.key_prefix}token:{token_hash}"
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            if self.username:
+                await self._send("AUTH", self.username, self.password)
+            else:
+                await self._send("AUTH", self.password)
+        if self.db:
+            await self._send("SELECT", str(self.db))
+
+    def _drop_connection(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = None
+        self._writer = None
+
+    async def _send(self, *args: str) -> Union[str, bytes, int, list, None]:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg.encode()
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        self._writer.write(b"".join(parts))
+        await self._writer.drain()
+        return await self._read_reply()
+
+    async def _read_reply(self) -> Union[str, bytes, int, List, None]:
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode()
+        if prefix == b"-":
+            raise RedisError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [await self._read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected Redis reply: {line!r}")
+
+    async def _execute(self, *args: str):
+        async with self._get_lock():
+            # Retry once on a stale connection, e.g. after the server closed an idle client
+            for attempt in range(2):
+                try:
+                    if self._writer is None:
+                        await asyncio.wait_for(self._connect(), timeout=self.timeout)
+                    return await asyncio.wait_for(self._send(*args), timeout=self.timeout)
+                except BaseException as e:
+                    # A failed, timed out or cancelled call may leave an unread reply behind,
+                    # never reuse such a connection for the next command
+                    self._drop_connection()
+                    if attempt or not isinstance(e, (ConnectionError, asyncio.IncompleteReadError)):
+                        raise
+
+    async def initialize(self):
+        await self._execute("PING")
+
+    async def get_credentials(self, workspace_name: str) -> Optional[dict]:
+        raw = await self._execute("GET", self._key(workspace_name))
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return {
+            "id": entry["id"],
+            "credentials": entry["credentials"]
+        }
+
+    async def store_credentials(self, workspace_name: str, workspace_id: str, credentials: dict):
+        entry = {
+            "id": workspace_id,
+            "credentials": credentials,
+            "updated_at": datetime.utcnow().isoformat()
+        }
+        await self._execute("SET", self._key(workspace_name), json.dumps(entry))
+
+    async def get_provisioning(self, workspace_name: str) -> Optional[dict]:
+        raw = await self._execute("GET", self._provisioning_key(workspace_name))
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return {
+            "job_id": entry["job_id"],
+            "status": entry["status"],
+            "error": entry["error"]
+        }
+
+    async def store_provisioning(self, workspace_name: str, job_id: str, status: str, error: Optional[str] = None):
+        entry = {
+            "job_id": job_id,
+            "status": status,
+            "error": error,
+            "updated_at": datetime.utcnow().isoformat()
+        }
+        await self._execute("SET", self._provisioning_key(workspace_name), json.dumps(entry))
+
+    async def delete_provisioning(self, workspace_name: str):
+        await self._execute("DEL", self._provisioning_key(workspace_name))
+
+    async def get_token_workspace(self, token_hash: str) -> Optional[str]:
+        raw = await self._execute("GET", self._token_key(token_hash))
+        return raw.decode() if raw is not None else None
+
+    async def store_token_workspace(self, token_hash: str, workspace_name: str, ttl_seconds: int):
+        await self._execute("SET", self._token_key(token_hash), workspace_name, "EX", str(ttl_seconds))
+
+    async def close(self):
+        async with self._get_lock():
+            writer = self._writer
+            self._drop_connection()
+            if writer is not None:
+                try:
+                    await writer.wait_closed()
+                except (ConnectionError, OSError):
+                    pass
+
+
+def create_credential_store(settings: Settings) -> CredentialStore:
+    """Create the credential store backend selected in settings"""
+    backend = settings.credential_store.lower()
+    if backend == "sqlite":
+        from .database import WorkspaceDatabase
+        return WorkspaceDatabase(settings.db_path)
+    if backend == "memory":
+        return InMemoryCredentialStore()
+    if backend == "redis":
+        return RedisCredentialStore(settings.redis_url, settings.redis_key_prefix, settings.redis_timeout)
+    raise ValueError(f"Unknown credential store backend: {settings.credential_store}")
@@ -1,18 +1,26 @@
 import aiosqlite
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 import os
 import asyncio
 from typing import Optional
 
-class WorkspaceDatabase:
-    def __init__(self):
-        self.db_path = 'data/workspaces.db'
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+from .credential_store import CredentialStore
+
+class WorkspaceDatabase(CredentialStore):
+    """SQLite credential store, local to the container"""
+
+    def __init__(self, db_path: str = 'data/workspaces.db'):
+        self.db_path = db_path
+        if os.path.dirname(self.db_path):
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         self._connection: Optional[aiosqlite.Connection] = None
-        self._lock = asyncio.Lock()
+        self._lock: Optional[asyncio.Lock] = None
         
     async def _get_connection(self) -> aiosqlite.Connection:
+        # Lock is created on first use so it binds to the server's event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
         async with self._lock:
             if self._connection is None:
                 self._connection = await aiosqlite.connect(self.db_path)
@@ -29,6 +37,22 @@ class WorkspaceDatabase:
                 updated_at DATETIME
             )
         ''')
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS workspace_provisioning (
+                workspace_name TEXT PRIMARY KEY,
+                job_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                updated_at DATETIME
+            )
+        ''')
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS token_workspaces (
+                token_hash TEXT PRIMARY KEY,
+                workspace_name TEXT NOT NULL,
+                expires_at DATETIME NOT NULL
+            )
+        ''')
         await conn.commit()
         
     async def get_credentials(self, workspace_name: str) -> dict:
@@ -53,6 +77,57 @@ class WorkspaceDatabase:
         ''', (workspace_name, workspace_id, json.dumps(credentials), datetime.utcnow()))
         await conn.commit()
         
+    async def get_provisioning(self, workspace_name: str) -> dict:
+        conn = await self._get_connection()
+        async with conn.execute(
+            'SELECT job_id, status, error FROM workspace_provisioning WHERE workspace_name = ?', 
+            (workspace_name,)
+        ) as cursor:
+            result = await cursor.fetchone()
+            if not result:
+                return None
+            return {
+                "job_id": result[0],
+                "status": result[1],
+                "error": result[2]
+            }
+
+    async def store_provisioning(self, workspace_name: str, job_id: str, status: str, error: Optional[str] = None):
+        conn = await self._get_connection()
+        await conn.execute('''
+            INSERT OR REPLACE INTO workspace_provisioning (workspace_name, job_id, status, error, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (workspace_name, job_id, status, error, datetime.utcnow()))
+        await conn.commit()
+
+    async def delete_provisioning(self, workspace_name: str):
+        conn = await self._get_connection()
+        await conn.execute(
+            'DELETE FROM workspace_provisioning WHERE workspace_name = ?', 
+            (workspace_name,)
+        )
+        await conn.commit()
+
+    async def get_token_workspace(self, token_hash: str) -> Optional[str]:
+        conn = await self._get_connection()
+        async with conn.execute(
+            'SELECT workspace_name FROM token_workspaces WHERE token_hash = ? AND expires_at > ?', 
+            (token_hash, datetime.utcnow())
+        ) as cursor:
+            result = await cursor.fetchone()
+            return result[0] if result else None
+
+    async def store_token_workspace(self, token_hash: str, workspace_name: str, ttl_seconds: int):
+        conn = await self._get_connection()
+        now = datetime.utcnow()
+        # Every token has its own hash, drop expired rows so the table does not grow forever
+        await conn.execute('DELETE FROM token_workspaces WHERE expires_at <= ?', (now,))
+        await conn.execute('''
+            INSERT OR REPLACE INTO token_workspaces (token_hash, workspace_name, expires_at)
+            VALUES (?, ?, ?)
+        ''', (token_hash, workspace_name, now + timedelta(seconds=ttl_seconds)))
+        await conn.commit()
+        
     async def close(self):
         """Close the database connection"""
         if self._connection is not None:
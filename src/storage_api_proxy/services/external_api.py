@@ -1,3 +1,4 @@
+import asyncio
 import httpx
 import json
 from typing import Optional, Dict
@@ -46,12 +47,8 @@ class ExternalApiClient:
             
         return response.json()
 
-    async def create_workspace(self, token: str) -> Dict:
-        """Create a new workspace"""
-        # Get token details to create proper workspace name
-        token_details = await self.get_token_details(token)
-        workspace_name = f"MCP_{token_details['id']}_{token_details.get('description', 'workspace')}"
-        
+    async def create_workspace(self, workspace_name: str, token: str) -> Dict:
+        """Start asynchronous workspace creation and return the storage job"""
         payload = {
             "name": workspace_name,
             "backend": "snowflake",
@@ -59,26 +56,63 @@ class ExternalApiClient:
         }
         
         response = await self.client.post(
-            f"{self.base_url}/storage/workspaces?async=false",
+            f"{self.base_url}/storage/workspaces?async=true",
             headers=self._get_headers(token),
             json=payload
         )
         
-        if response.status_code != 201:
+        if response.status_code != 202:
             error_data = response.json()
             raise Exception(error_data.get("message", "Failed to create workspace"))
             
-        workspace_data = response.json()
+        return response.json()
+
+    async def get_job(self, job_id: str, token: str) -> Dict:
+        """Get storage job details"""
+        response = await self.client.get(
+            f"{self.base_url}/storage/jobs/{job_id}",
+            headers=self._get_headers(token)
+        )
+        
+        if response.status_code != 200:
+            error_data = response.json()
+            raise Exception(error_data.get("message", "Failed to get job"))
+            
+        return response.json()
+
+    async def wait_for_workspace_job(self, job_id: str, token: str) -> Dict:
+        """Poll a workspace creation job until it finishes and return the workspace"""
+        deadline = asyncio.get_running_loop().time() + self.settings.workspace_job_timeout
+        last_error = None
+        while True:
+            try:
+                job = await self.get_job(job_id, token)
+            except Exception as e:
+                # The job keeps running on a failed poll, only its own error or the deadline is final
+                job = {}
+                last_error = e
+            if job.get("status") == "success":
+                return self._workspace_data(job.get("results") or {})
+            if job.get("status") == "error":
+                message = (job.get("error") or {}).get("message", "job failed")
+                raise Exception(f"Failed to create workspace: {message}")
+            if asyncio.get_running_loop().time() >= deadline:
+                reason = f", last poll error: {last_error}" if last_error else ""
+                raise Exception(f"Failed to create workspace: job {job_id} did not finish in time{reason}")
+            await asyncio.sleep(self.settings.workspace_job_poll_interval)
+
+    def _workspace_data(self, workspace_data: Dict) -> Dict:
+        connection = workspace_data.get("connection", {})
         return {
             "id": workspace_data.get("id"),
             "name": workspace_data.get("name"),
             "credentials": {
-                "host": workspace_data.get("connection", {}).get("host"),
-                "warehouse": workspace_data.get("connection", {}).get("warehouse"),
-                "database": workspace_data.get("connection", {}).get("database"),
-                "schema": workspace_data.get("connection", {}).get("schema"),
-                "user": workspace_data.get("connection", {}).get("user"),
-                "password": workspace_data.get("connection", {}).get("password")
+                "host": connection.get("host"),
+                "warehouse": connection.get("warehouse"),
+                "database": connection.get("database"),
+                "schema": connection.get("schema"),
+                "user": connection.get("user"),
+                "password": connection.get("password")
             }
         }
 
@@ -16,15 +16,16 @@ class WorkspaceLocks:
             
             if workspace_name not in self.locks:
                 self.locks[workspace_name] = asyncio.Lock()
-            
-            try:
-                # Try to acquire the lock with timeout
-                lock = self.locks[workspace_name]
-                await asyncio.wait_for(lock.acquire(), timeout=self.timeout)
-                self.lock_times[workspace_name] = datetime.utcnow()
-                return True
-            except asyncio.TimeoutError:
-                return False
+            lock = self.locks[workspace_name]
+
+        # Wait outside the shared lock so other workspaces are not blocked
+        try:
+            # Try to acquire the lock with timeout
+            await asyncio.wait_for(lock.acquire(), timeout=self.timeout)
+            self.lock_times[workspace_name] = datetime.utcnow()
+            return True
+        except asyncio.TimeoutError:
+            return False
 
     async def release_lock(self, workspace_name: str) -> None:
         """Release a workspace lock"""
@@ -0,0 +1,117 @@
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+READ_ONLY_KEYWORDS = {"select", "with", "show", "describe", "desc", "explain"}
+# Calls that have side effects even inside a SELECT, e.g. my_seq.NEXTVAL or SYSTEM$CANCEL_QUERY
+SIDE_EFFECT_MARKERS = ("nextval", "system$")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalise SQL for coalescing: lowercase and collapse whitespace outside of
+    literals, quoted identifiers and comments (kept verbatim), drop trailing semicolons
+    """
+    text = query.strip().rstrip(";").strip()
+    parts = []
+    pending_space = False
+    position = 0
+    while position < len(text):
+        char = text[position]
+        if char.isspace():
+            pending_space = True
+            position += 1
+            continue
+        if pending_space and parts:
+            parts.append(" ")
+        pending_space = False
+        end = _verbatim_end(text, position)
+        if end > position:
+            parts.append(text[position:end])
+            position = end
+        else:
+            parts.append(char.lower())
+            position += 1
+    return "".join(parts)
+
+
+def _verbatim_end(text: str, start: int) -> int:
+    """
+    Return the end of the literal, quoted identifier or comment starting at start,
+    or start itself if there is none. Unterminated ones run to the end of the text.
+    """
+    if text.startswith("$$", start):
+        end = text.find("$$", start + 2)
+        return len(text) if end == -1 else end + 2
+    if text.startswith("--", start) or text.startswith("//", start):
+        # Keep the terminating newline, it decides what the comment covers
+        end = text.find("\n", start)
+        return len(text) if end == -1 else end + 1
+    if text.startswith("/*", start):
+        end = text.find("*/", start + 2)
+        return len(text) if end == -1 else end + 2
+    if text[start] in ("'", '"'):
+        quote = text[start]
+        position = start + 1
+        while position < len(text):
+            if quote == "'" and text[position] == "\\":
+                position += 2
+                continue
+            if text[position] == quote:
+                return position + 1
+            position += 1
+        return len(text)
+    return start
+
+
+def is_read_only(normalized_query: str) -> bool:
+    """Check whether a normalised single statement only reads data and has no side effects"""
+    match = re.match(r"[a-z]+", normalized_query.lstrip("("))
+    if not match or match.group(0) not in READ_ONLY_KEYWORDS or ";" in normalized_query:
+        return False
+    lowered = normalized_query.lower()
+    return not any(marker in lowered for marker in SIDE_EFFECT_MARKERS)
+
+
+class QueryCoalescer:
+    """
+    Single-flight execution of identical read-only queries per workspace.
+    The first caller starts the execution, concurrent duplicates await it and
+    share its result or error.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def run(self, workspace_name: str, query: str, execute: Callable[[], Awaitable[Any]]) -> Any:
+        normalized = normalize_query(query)
+        if not is_read_only(normalized):
+            self.executions += 1
+            return await execute()
+
+        key = (workspace_name, normalized)
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executions += 1
+            # Run detached so a cancelled leader request does not fail its followers
+            task = asyncio.ensure_future(execute())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Tuple[str, str], task: asyncio.Task) -> None:
+        self._in_flight.pop(key, None)
+        if not task.cancelled():
+            # Mark the error as retrieved in case every waiter went away
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight)
+        }
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Dict
 import snowflake.connector
 from snowflake.connector.cursor import SnowflakeCursor
@@ -6,6 +7,12 @@ async def execute_query(credentials: Dict, query: str) -> Dict:
     """
     Execute SQL query in Snowflake workspace
     """
+    # The connector is blocking, run it off the event loop
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _execute_query_sync, credentials, query)
+
+
+def _execute_query_sync(credentials: Dict, query: str) -> Dict:
     # Connect to Snowflake
     conn = snowflake.connector.connect(
         user=credentials["user"],
@@ -33,4 +40,4 @@ async def execute_query(credentials: Dict, query: str) -> Dict:
         }
         
     finally:
-        conn.close() 
\ No newline at end of file
+        conn.close()
\ No newline at end of file
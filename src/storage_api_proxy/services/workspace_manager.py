@@ -1,22 +1,48 @@
-from ..services.database import WorkspaceDatabase
+from ..core.config import get_settings
+from ..services.credential_store import CredentialStore
 from ..services.locks import WorkspaceLocks
 from ..services.external_api import ExternalApiClient
+from typing import Dict
+import asyncio
 import hashlib
 
+
+class WorkspaceProvisioning(Exception):
+    """Raised when a workspace is still being created by a storage job"""
+
+    def __init__(self, workspace_name: str, job_id: str):
+        super().__init__(f"Workspace {workspace_name} is being provisioned")
+        self.workspace_name = workspace_name
+        self.job_id = job_id
+
+
 class WorkspaceManager:
-    def __init__(self, db: WorkspaceDatabase):
+    def __init__(self, db: CredentialStore):
         self.db = db
         self.locks = WorkspaceLocks()
         self.api_client = ExternalApiClient()
+        self.settings = get_settings()
+        self._provisioning: Dict[str, asyncio.Task] = {}
 
     async def generate_workspace_name(self, token: str) -> str:
         """Generate workspace name from token details"""
+        # Only a hash of the token is kept in the shared store
+        token_hash = hashlib.sha256(token.encode()).hexdigest()
+        ttl = self.settings.token_cache_ttl
+        if ttl > 0:
+            workspace_name = await self.db.get_token_workspace(token_hash)
+            if workspace_name:
+                return workspace_name
+
         token_details = await self.api_client.get_token_details(token)
-        return f"MCP_{token_details['id']}_{token_details.get('description', 'workspace')}"
+        workspace_name = f"MCP_{token_details['id']}_{token_details.get('description', 'workspace')}"
+        if ttl > 0:
+            await self.db.store_token_workspace(token_hash, workspace_name, ttl)
+        return workspace_name
 
     async def get_or_create_workspace(self, token: str) -> dict:
         workspace_name = await self.generate_workspace_name(token)
-        
+
         # First try to get credentials from cache
         workspace_data = await self.db.get_credentials(workspace_name)
         if workspace_data:
@@ -40,26 +66,115 @@ class WorkspaceManager:
                     "credentials": workspace_data["credentials"]
                 }
 
-            # Check if workspace exists
-            workspace = await self.api_client.get_workspace(workspace_name, token)
-            
-            if workspace:
-                # Workspace exists but credentials missing - reset password
-                credentials = await self.api_client.reset_password(workspace_name, token)
-                workspace_id = str(workspace.get("id"))
+            # Resume a creation job started by this or another instance
+            provisioning = await self.db.get_provisioning(workspace_name)
+            if provisioning and provisioning["status"] == "processing":
+                job_id = provisioning["job_id"]
             else:
-                # Create new workspace
-                workspace_data = await self.api_client.create_workspace(token)
-                credentials = workspace_data["credentials"]
-                workspace_id = str(workspace_data["id"])
+                # Check if workspace exists
+                workspace = await self.api_client.get_workspace(workspace_name, token)
+
+                if workspace:
+                    # Workspace exists but credentials missing - reset password
+                    credentials = await self.api_client.reset_password(workspace_name, token)
+                    workspace_id = str(workspace.get("id"))
+                    await self.db.store_credentials(workspace_name, workspace_id, credentials)
+                    return {
+                        "workspace_name": workspace_name,
+                        "workspace_id": workspace_id,
+                        "credentials": credentials
+                    }
+
+                # Start creating a new workspace, the job is polled in the background
+                job = await self.api_client.create_workspace(workspace_name, token)
+                job_id = str(job["id"])
+                await self.db.store_provisioning(workspace_name, job_id, "processing")
+
+            task = self._ensure_provisioning_task(workspace_name, job_id, token)
+
+        finally:
+            await self.locks.release_lock(workspace_name)
+
+        # Wait a while for the credentials to land, then let the client poll
+        try:
+            workspace_data = await asyncio.wait_for(
+                asyncio.shield(task),
+                timeout=self.settings.workspace_provisioning_wait
+            )
+        except asyncio.TimeoutError:
+            raise WorkspaceProvisioning(workspace_name, job_id)
+
+        return {
+            "workspace_name": workspace_name,
+            "workspace_id": workspace_data["id"],
+            "credentials": workspace_data["credentials"]
+        }
+
+    async def get_workspace_status(self, token: str) -> dict:
+        """Get provisioning status of the token's workspace"""
+        workspace_name = await self.generate_workspace_name(token)
 
-            # Store credentials in cache
-            await self.db.store_credentials(workspace_name, workspace_id, credentials)
+        workspace_data = await self.db.get_credentials(workspace_name)
+        if workspace_data:
             return {
                 "workspace_name": workspace_name,
-                "workspace_id": workspace_id,
-                "credentials": credentials
+                "workspace_id": str(workspace_data["id"]),
+                "status": "ready"
             }
 
-        finally:
-            await self.locks.release_lock(workspace_name) 
\ No newline at end of file
+        provisioning = await self.db.get_provisioning(workspace_name)
+        if not provisioning:
+            return {
+                "workspace_name": workspace_name,
+                "status": "not_found"
+            }
+
+        if provisioning["status"] == "processing":
+            # Make sure the job is polled even if the instance that started it went away
+            self._ensure_provisioning_task(workspace_name, provisioning["job_id"], token)
+
+        return {
+            "workspace_name": workspace_name,
+            "job_id": provisioning["job_id"],
+            "status": provisioning["status"],
+            "error": provisioning["error"]
+        }
+
+    def _ensure_provisioning_task(self, workspace_name: str, job_id: str, token: str) -> asyncio.Task:
+        task = self._provisioning.get(workspace_name)
+        if task is None:
+            task = asyncio.ensure_future(self._provision(workspace_name, job_id, token))
+            self._provisioning[workspace_name] = task
+            task.add_done_callback(lambda done: self._provisioning_finished(workspace_name, done))
+        return task
+
+    def _provisioning_finished(self, workspace_name: str, task: asyncio.Task) -> None:
+        if self._provisioning.get(workspace_name) is task:
+            del self._provisioning[workspace_name]
+        if not task.cancelled():
+            # Mark the error as retrieved, it is recorded in the credential store
+            task.exception()
+
+    async def _provision(self, workspace_name: str, job_id: str, token: str) -> dict:
+        """Wait for a workspace creation job and store the new credentials"""
+        try:
+            workspace = await self.api_client.wait_for_workspace_job(job_id, token)
+        except Exception as e:
+            await self.db.store_provisioning(workspace_name, job_id, "error", str(e))
+            raise
+
+        workspace_id = str(workspace["id"])
+        await self.db.store_credentials(workspace_name, workspace_id, workspace["credentials"])
+        await self.db.delete_provisioning(workspace_name)
+        return {
+            "id": workspace_id,
+            "credentials": workspace["credentials"]
+        }
+
+    async def close(self):
+        """Stop background provisioning, jobs are resumed from the credential store later"""
+        tasks = list(self._provisioning.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.api_client.client.aclose()
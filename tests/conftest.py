@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.fixture
+def credentials():
+    return {
+        "host": "test.snowflakecomputing.com",
+        "warehouse": "TEST_WH",
+        "database": "TEST_DB",
+        "schema": "TEST_SCHEMA",
+        "user": "test_user",
+        "password": "test_password"
+    }
@@ -0,0 +1,292 @@
+import asyncio
+import time
+
+import pytest
+
+from storage_api_proxy.core.config import Settings
+from storage_api_proxy.services.credential_store import (
+    InMemoryCredentialStore,
+    RedisCredentialStore,
+    RedisError,
+    create_credential_store,
+)
+from storage_api_proxy.services.database import WorkspaceDatabase
+
+
+class FakeRedisServer:
+    """Stand-in Redis server implementing the commands used by RedisCredentialStore"""
+
+    def __init__(self, password=None):
+        self.password = password
+        self.data = {}
+        self.expires_at = {}
+        self.commands = []
+        self.reply_delay = 0
+        self._server = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}127.0.0.1:{port}/2"
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        authenticated = self.password is None
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                args = []
+                for _ in range(int(header[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2].decode())
+                self.commands.append(args)
+                await asyncio.sleep(self.reply_delay)
+                command = args[0].upper()
+                if command == "AUTH":
+                    authenticated = args[-1] == self.password
+                    writer.write(b"+OK\r\n" if authenticated else b"-WRONGPASS invalid password\r\n")
+                elif not authenticated:
+                    writer.write(b"-NOAUTH Authentication required.\r\n")
+                elif command == "PING":
+                    writer.write(b"+PONG\r\n")
+                elif command == "SELECT":
+                    writer.write(b"+OK\r\n")
+                elif command == "SET":
+                    self.data[args[1]] = args[2].encode()
+                    if len(args) == 5 and args[3].upper() == "EX":
+                        self.expires_at[args[1]] = time.monotonic() + int(args[4])
+                    writer.write(b"+OK\r\n")
+                elif command == "DEL":
+                    writer.write(f":{int(self.data.pop(args[1], None) is not None)}\r\n".encode())
+                elif command == "GET":
+                    if time.monotonic() >= self.expires_at.get(args[1], float("inf")):
+                        self.data.pop(args[1], None)
+                    value = self.data.get(args[1])
+                    if value is None:
+                        writer.write(b"$-1\r\n")
+                    else:
+                        writer.write(f"${len(value)}\r\n".encode() + value + b"\r\n")
+                else:
+                    writer.write(f"-ERR unknown command '{args[0]}'\r\n".encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+@pytest.fixture
+async def redis_server():
+    server = FakeRedisServer(password="secret")
+    url = await server.start()
+    yield server, url
+    await server.stop()
+
+
+@pytest.fixture
+async def sqlite_store(tmp_path):
+    store = WorkspaceDatabase(str(tmp_path / "credentials.db"))
+    await store.initialize()
+    yield store
+    await store.close()
+
+
+@pytest.fixture
+async def redis_store(redis_server):
+    _, url = redis_server
+    store = RedisCredentialStore(url, key_prefix="test:")
+    await store.initialize()
+    yield store
+    await store.close()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request):
+    if request.param == "memory":
+        return InMemoryCredentialStore()
+    return request.getfixturevalue(f"{request.param}_store")
+
+
+@pytest.mark.asyncio
+async def test_store_credentials_round_trip(store, credentials):
+    assert await store.get_credentials("ws") is None
+
+    await store.store_credentials("ws", "123", credentials)
+    assert await store.get_credentials("ws") == {"id": "123", "credentials": credentials}
+
+    await store.store_credentials("ws", "123", {**credentials, "password": "new"})
+    assert await store.get_credentials("ws") == {"id": "123", "credentials": {**credentials, "password": "new"}}
+
+
+@pytest.mark.asyncio
+async def test_store_provisioning_round_trip(store):
+    assert await store.get_provisioning("ws") is None
+
+    await store.store_provisioning("ws", "42", "processing")
+    assert await store.get_provisioning("ws") == {"job_id": "42", "status": "processing", "error": None}
+
+    await store.store_provisioning("ws", "42", "error", "Failed to create workspace: quota exceeded")
+    assert await store.get_provisioning("ws") == {
+        "job_id": "42",
+        "status": "error",
+        "error": "Failed to create workspace: quota exceeded"
+    }
+
+    await store.delete_provisioning("ws")
+    assert await store.get_provisioning("ws") is None
+
+
+@pytest.mark.asyncio
+async def test_store_token_workspace_round_trip(store):
+    assert await store.get_token_workspace("hash") is None
+
+    await store.store_token_workspace("hash", "MCP_1_test", 60)
+    await store.store_token_workspace("expired", "MCP_2_test", 0)
+
+    assert await store.get_token_workspace("hash") == "MCP_1_test"
+    assert await store.get_token_workspace("expired") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_store_uses_key_prefix_and_connection_settings(redis_server, redis_store, credentials):
+    server, _ = redis_server
+    await redis_store.store_credentials("ws", "123", credentials)
+    await redis_store.store_token_workspace("hash", "MCP_1_test", 60)
+
+    assert "test:ws" in server.data
+    assert ["SET", "test:token:hash", "MCP_1_test", "EX", "60"] in server.commands
+    assert server.commands[:2] == [["AUTH", "secret"], ["SELECT", "2"]]
+
+
+@pytest.mark.asyncio
+async def test_redis_store_shares_credentials_between_instances(redis_server, credentials):
+    _, url = redis_server
+    first = RedisCredentialStore(url)
+    second = RedisCredentialStore(url)
+    try:
+        await first.store_credentials("ws", "123", credentials)
+        assert await second.get_credentials("ws") == {"id": "123", "credentials": credentials}
+    finally:
+        await first.close()
+        await second.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_store_reconnects_after_server_closes_connection(redis_server, credentials):
+    _, url = redis_server
+    store = RedisCredentialStore(url)
+    try:
+        await store.store_credentials("ws", "123", credentials)
+        store._writer.transport.abort()
+
+        assert await store.get_credentials("ws") == {"id": "123", "credentials": credentials}
+    finally:
+        await store.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_store_drops_connection_of_cancelled_call(redis_server, credentials):
+    server, url = redis_server
+    store = RedisCredentialStore(url)
+    try:
+        await store.store_credentials("a", "A", {**credentials, "password": "pa"})
+        await store.store_credentials("b", "B", {**credentials, "password": "pb"})
+
+        server.reply_delay = 0.05
+        pending = asyncio.ensure_future(store.get_credentials("a"))
+        await asyncio.sleep(0.01)
+        pending.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await pending
+        server.reply_delay = 0
+
+        assert await store.get_credentials("b") == {"id": "B", "credentials": {**credentials, "password": "pb"}}
+    finally:
+        await store.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_store_times_out_on_hung_server(redis_server, credentials):
+    server, url = redis_server
+    store = RedisCredentialStore(url, timeout=0.05)
+    try:
+        await store.store_credentials("ws", "123", credentials)
+
+        server.reply_delay = 1
+        with pytest.raises(asyncio.TimeoutError):
+            await store.get_credentials("ws")
+        assert store._writer is None
+        server.reply_delay = 0
+
+        assert await store.get_credentials("ws") == {"id": "123", "credentials": credentials}
+    finally:
+        await store.close()
+
+
+def test_redis_store_created_outside_event_loop_handles_concurrent_calls(credentials):
+    # Stores are built at import time, before the server's event loop exists
+    store = RedisCredentialStore("redis://127.0.0.1/0")
+
+    async def run():
+        server = FakeRedisServer()
+        url = await server.start()
+        store.port = int(url.rsplit(":", 1)[1].split("/")[0])
+        server.reply_delay = 0.01
+        try:
+            await store.store_credentials("ws", "123", credentials)
+            return await asyncio.gather(*[store.get_credentials("ws") for _ in range(3)])
+        finally:
+            await store.close()
+            await server.stop()
+
+    results = asyncio.run(run())
+
+    assert results == [{"id": "123", "credentials": credentials}] * 3
+
+
+@pytest.mark.asyncio
+async def test_redis_store_raises_on_wrong_password(redis_server):
+    _, url = redis_server
+    store = RedisCredentialStore(url.replace("secret", "wrong"))
+    try:
+        with pytest.raises(RedisError):
+            await store.initialize()
+        assert store._writer is None
+    finally:
+        await store.close()
+
+
+@pytest.mark.asyncio
+async def test_in_memory_store_prunes_expired_token_workspaces():
+    store = InMemoryCredentialStore()
+    await store.store_token_workspace("expired", "MCP_1_test", 0)
+    await store.store_token_workspace("hash", "MCP_2_test", 60)
+
+    assert list(store._token_workspaces) == ["hash"]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_prunes_expired_token_workspaces(sqlite_store):
+    await sqlite_store.store_token_workspace("expired", "MCP_1_test", 0)
+    await sqlite_store.store_token_workspace("hash", "MCP_2_test", 60)
+
+    conn = await sqlite_store._get_connection()
+    async with conn.execute('SELECT token_hash FROM token_workspaces') as cursor:
+        assert await cursor.fetchall() == [("hash",)]
+
+
+def test_create_credential_store_uses_configured_backend(tmp_path):
+    assert isinstance(
+        create_credential_store(Settings(credential_store="sqlite", db_path=str(tmp_path / "c.db"))),
+        WorkspaceDatabase
+    )
+    assert isinstance(create_credential_store(Settings(credential_store="memory")), InMemoryCredentialStore)
+    assert isinstance(create_credential_store(Settings(credential_store="redis")), RedisCredentialStore)
+    with pytest.raises(ValueError):
+        create_credential_store(Settings(credential_store="unknown"))
@@ -0,0 +1,77 @@
+import httpx
+import pytest
+from unittest.mock import AsyncMock
+
+from storage_api_proxy.core.config import Settings
+from storage_api_proxy.services.external_api import ExternalApiClient
+
+
+@pytest.fixture
+def api_client():
+    client = ExternalApiClient()
+    client.settings = Settings(workspace_job_poll_interval=0, workspace_job_timeout=5)
+    client.get_job = AsyncMock()
+    return client
+
+
+def finished_job(credentials):
+    return {
+        "id": 42,
+        "status": "success",
+        "results": {"id": 123, "name": "MCP_1_test", "connection": credentials}
+    }
+
+
+@pytest.mark.asyncio
+async def test_wait_for_workspace_job_retries_failed_polls(api_client, credentials):
+    api_client.get_job.side_effect = [
+        Exception("Service Unavailable"),
+        {"id": 42, "status": "processing"},
+        finished_job(credentials),
+    ]
+
+    workspace = await api_client.wait_for_workspace_job("42", "test-token")
+
+    assert workspace == {"id": 123, "name": "MCP_1_test", "credentials": credentials}
+    assert api_client.get_job.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_wait_for_workspace_job_fails_on_job_error(api_client):
+    api_client.get_job.return_value = {"id": 42, "status": "error", "error": {"message": "quota exceeded"}}
+
+    with pytest.raises(Exception, match="Failed to create workspace: quota exceeded"):
+        await api_client.wait_for_workspace_job("42", "test-token")
+    api_client.get_job.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_wait_for_workspace_job_fails_after_deadline(api_client):
+    api_client.settings = Settings(workspace_job_poll_interval=0.01, workspace_job_timeout=0)
+    api_client.get_job.side_effect = Exception("Service Unavailable")
+
+    with pytest.raises(Exception, match="did not finish in time, last poll error: Service Unavailable"):
+        await api_client.wait_for_workspace_job("42", "test-token")
+
+
+def mock_transport_client(status_code, body):
+    client = ExternalApiClient()
+    client.client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(status_code, json=body))
+    )
+    return client
+
+
+@pytest.mark.asyncio
+async def test_create_workspace_returns_accepted_job():
+    client = mock_transport_client(202, {"id": 42, "status": "waiting"})
+
+    assert await client.create_workspace("MCP_1_test", "test-token") == {"id": 42, "status": "waiting"}
+
+
+@pytest.mark.asyncio
+async def test_create_workspace_rejects_synchronous_response():
+    client = mock_transport_client(201, {"id": 123, "name": "MCP_1_test"})
+
+    with pytest.raises(Exception, match="Failed to create workspace"):
+        await client.create_workspace("MCP_1_test", "test-token")
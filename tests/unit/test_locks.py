@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from storage_api_proxy.services.locks import WorkspaceLocks
+
+
+@pytest.mark.asyncio
+async def test_waiting_for_locked_workspace_does_not_block_other_workspaces():
+    locks = WorkspaceLocks(timeout_seconds=1)
+    assert await locks.acquire_lock("a")
+
+    waiting = asyncio.ensure_future(locks.acquire_lock("a"))
+    await asyncio.sleep(0.01)
+
+    assert await asyncio.wait_for(locks.acquire_lock("b"), timeout=0.1)
+    assert not waiting.done()
+
+    await locks.release_lock("a")
+    assert await waiting
+    await locks.release_lock("a")
+    await locks.release_lock("b")
+
+
+@pytest.mark.asyncio
+async def test_acquire_lock_times_out():
+    locks = WorkspaceLocks(timeout_seconds=0.05)
+    assert await locks.acquire_lock("a")
+
+    assert not await locks.acquire_lock("a")
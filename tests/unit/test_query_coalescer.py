@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from storage_api_proxy.services.query_coalescer import QueryCoalescer, is_read_only, normalize_query
+
+
+def test_normalize_query_collapses_whitespace_outside_literals():
+    assert normalize_query("  SELECT  *\n FROM   T WHERE a = 'X  Y' ;  ") == "select * from t where a = 'X  Y'"
+    assert normalize_query('select "Col  A" from t') == 'select "Col  A" from t'
+
+
+def test_normalize_query_keeps_dollar_quoted_literals_verbatim():
+    assert normalize_query("SELECT $$A  B$$") == "select $$A  B$$"
+    assert normalize_query("SELECT $$A  B$$") != normalize_query("SELECT $$a b$$")
+
+
+def test_normalize_query_keeps_comments_verbatim():
+    assert normalize_query("SELECT id -- pick\nFROM users") != normalize_query("SELECT id -- pick FROM users")
+    assert normalize_query("SELECT id // Pick  X\nFROM users") == "select id // Pick  X\nfrom users"
+    assert normalize_query("SELECT /* Pick  X */ id") == "select /* Pick  X */ id"
+
+
+def test_normalize_query_respects_backslash_escapes():
+    assert normalize_query("SELECT 'It\\'s  X' AS A") == "select 'It\\'s  X' as a"
+    assert normalize_query("SELECT 'It\\'s  X'") != normalize_query("SELECT 'It\\'s x'")
+
+
+def test_is_read_only():
+    assert is_read_only(normalize_query("SELECT 1"))
+    assert is_read_only(normalize_query("with a as (select 1) select * from a"))
+    assert is_read_only(normalize_query("(SELECT 1) UNION (SELECT 2)"))
+    assert is_read_only(normalize_query("SHOW TABLES"))
+    assert not is_read_only(normalize_query("INSERT INTO t VALUES (1)"))
+    assert not is_read_only(normalize_query("SELECT 1; DROP TABLE t"))
+
+
+def test_is_read_only_excludes_side_effecting_selects():
+    assert not is_read_only(normalize_query("SELECT my_seq.NEXTVAL"))
+    assert not is_read_only(normalize_query("SELECT id, seq.nextval FROM t"))
+    assert not is_read_only(normalize_query("SELECT SYSTEM$CANCEL_QUERY('01a2')"))
+    assert not is_read_only(normalize_query("SELECT system$wait(1)"))
+
+
+@pytest.mark.asyncio
+async def test_side_effecting_selects_are_not_coalesced():
+    coalescer = QueryCoalescer()
+    calls = 0
+
+    async def execute():
+        nonlocal calls
+        calls += 1
+        value = calls
+        await asyncio.sleep(0.01)
+        return value
+
+    results = await asyncio.gather(
+        coalescer.run("ws", "SELECT my_seq.NEXTVAL", execute),
+        coalescer.run("ws", "SELECT my_seq.NEXTVAL", execute),
+    )
+
+    assert sorted(results) == [1, 2]
+    assert coalescer.stats()["coalesced"] == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_share_single_execution():
+    coalescer = QueryCoalescer()
+    calls = 0
+
+    async def execute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"columns": ["N"], "rows": [[1]]}
+
+    results = await asyncio.gather(
+        coalescer.run("ws", "SELECT 1 AS n", execute),
+        coalescer.run("ws", "select 1  as n;", execute),
+        coalescer.run("ws", "SELECT 1 AS n", execute),
+    )
+
+    assert calls == 1
+    assert all(result == {"columns": ["N"], "rows": [[1]]} for result in results)
+    assert coalescer.stats() == {"executions": 1, "coalesced": 2, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_share_error():
+    coalescer = QueryCoalescer()
+    calls = 0
+
+    async def execute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise Exception("SQL compilation error: syntax error")
+
+    results = await asyncio.gather(
+        coalescer.run("ws", "SELECT x FROM", execute),
+        coalescer.run("ws", "SELECT x FROM", execute),
+        return_exceptions=True
+    )
+
+    assert calls == 1
+    assert all("syntax error" in str(result) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_writes_and_other_workspaces_are_not_coalesced():
+    coalescer = QueryCoalescer()
+    calls = 0
+
+    async def execute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    await asyncio.gather(
+        coalescer.run("ws", "INSERT INTO t VALUES (1)", execute),
+        coalescer.run("ws", "INSERT INTO t VALUES (1)", execute),
+        coalescer.run("ws_a", "SELECT 1", execute),
+        coalescer.run("ws_b", "SELECT 1", execute),
+    )
+
+    assert calls == 4
+    assert coalescer.stats()["coalesced"] == 0
+
+
+@pytest.mark.asyncio
+async def test_sequential_queries_execute_again():
+    coalescer = QueryCoalescer()
+    calls = 0
+
+    async def execute():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await coalescer.run("ws", "SELECT 1", execute) == 1
+    assert await coalescer.run("ws", "SELECT 1", execute) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_fail_followers():
+    coalescer = QueryCoalescer()
+
+    async def execute():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    leader = asyncio.ensure_future(coalescer.run("ws", "SELECT 1", execute))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(coalescer.run("ws", "SELECT 1", execute))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "done"
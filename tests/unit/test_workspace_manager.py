@@ -1,7 +1,11 @@
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, patch
 
-from storage_api_proxy.services.workspace_manager import WorkspaceManager
+from storage_api_proxy.core.config import Settings
+from storage_api_proxy.services.credential_store import InMemoryCredentialStore
+from storage_api_proxy.services.workspace_manager import WorkspaceManager, WorkspaceProvisioning
 from storage_api_proxy.schemas.models import WorkspaceData, WorkspaceCredentials
 
 
@@ -36,4 +40,126 @@ async def test_get_workspace_creates_new_workspace(workspace_manager, mock_works
         result = await workspace_manager.get_workspace()
         
         assert result == mock_workspace_data
-        mock_create.assert_called_once_with("test-token") 
\ No newline at end of file
+        mock_create.assert_called_once_with("test-token")
+
+
+@pytest.fixture
+def provisioning_manager():
+    manager = WorkspaceManager(InMemoryCredentialStore())
+    manager.settings = Settings(workspace_provisioning_wait=0.05)
+    manager.api_client = AsyncMock()
+    manager.api_client.get_token_details.return_value = {"id": "1", "description": "test"}
+    manager.api_client.get_workspace.return_value = None
+    manager.api_client.create_workspace.return_value = {"id": 42, "status": "waiting"}
+    return manager
+
+
+def workspace_job(credentials, delay, error=None):
+    async def wait_for_workspace_job(job_id, token):
+        await asyncio.sleep(delay)
+        if error:
+            raise Exception(error)
+        return {"id": 123, "name": "MCP_1_test", "credentials": credentials}
+    return wait_for_workspace_job
+
+
+@pytest.mark.asyncio
+async def test_fast_provisioning_returns_credentials(provisioning_manager, credentials):
+    provisioning_manager.api_client.wait_for_workspace_job.side_effect = workspace_job(credentials, 0)
+
+    result = await provisioning_manager.get_or_create_workspace("test-token")
+
+    assert result == {"workspace_name": "MCP_1_test", "workspace_id": "123", "credentials": credentials}
+    provisioning_manager.api_client.create_workspace.assert_called_once_with("MCP_1_test", "test-token")
+    assert await provisioning_manager.db.get_provisioning("MCP_1_test") is None
+
+
+@pytest.mark.asyncio
+async def test_slow_provisioning_raises_until_credentials_land(provisioning_manager, credentials):
+    provisioning_manager.api_client.wait_for_workspace_job.side_effect = workspace_job(credentials, 0.2)
+
+    with pytest.raises(WorkspaceProvisioning) as first:
+        await provisioning_manager.get_or_create_workspace("test-token")
+    with pytest.raises(WorkspaceProvisioning):
+        await provisioning_manager.get_or_create_workspace("test-token")
+    status = await provisioning_manager.get_workspace_status("test-token")
+
+    assert first.value.job_id == "42"
+    assert status["status"] == "processing"
+    provisioning_manager.api_client.create_workspace.assert_called_once()
+
+    await asyncio.sleep(0.2)
+    result = await provisioning_manager.get_or_create_workspace("test-token")
+
+    assert result["workspace_id"] == "123"
+    assert (await provisioning_manager.get_workspace_status("test-token"))["status"] == "ready"
+    provisioning_manager.api_client.wait_for_workspace_job.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_queued_requests_resume_when_credentials_land(provisioning_manager, credentials):
+    provisioning_manager.settings = Settings(workspace_provisioning_wait=5)
+    provisioning_manager.api_client.wait_for_workspace_job.side_effect = workspace_job(credentials, 0.05)
+
+    results = await asyncio.gather(*[
+        provisioning_manager.get_or_create_workspace("test-token") for _ in range(3)
+    ])
+
+    assert all(result["credentials"] == credentials for result in results)
+    provisioning_manager.api_client.create_workspace.assert_called_once()
+    provisioning_manager.api_client.wait_for_workspace_job.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_provisioning_is_reported_and_retried(provisioning_manager, credentials):
+    provisioning_manager.api_client.wait_for_workspace_job.side_effect = workspace_job(
+        credentials, 0, error="Failed to create workspace: quota exceeded"
+    )
+
+    with pytest.raises(Exception, match="Failed to create workspace"):
+        await provisioning_manager.get_or_create_workspace("test-token")
+    status = await provisioning_manager.get_workspace_status("test-token")
+
+    assert status["status"] == "error"
+    assert "quota exceeded" in status["error"]
+
+    provisioning_manager.api_client.wait_for_workspace_job.side_effect = workspace_job(credentials, 0)
+    result = await provisioning_manager.get_or_create_workspace("test-token")
+
+    assert result["workspace_id"] == "123"
+    assert provisioning_manager.api_client.create_workspace.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_status_resumes_job_started_by_another_instance(provisioning_manager, credentials):
+    provisioning_manager.api_client.wait_for_workspace_job.side_effect = workspace_job(credentials, 0)
+    await provisioning_manager.db.store_provisioning("MCP_1_test", "7", "processing")
+
+    status = await provisioning_manager.get_workspace_status("test-token")
+    await asyncio.sleep(0.01)
+
+    assert status["status"] == "processing"
+    provisioning_manager.api_client.wait_for_workspace_job.assert_called_once_with("7", "test-token")
+    assert (await provisioning_manager.db.get_credentials("MCP_1_test"))["id"] == "123"
+    provisioning_manager.api_client.create_workspace.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_verified_token_is_cached_in_credential_store(provisioning_manager):
+    provisioning_manager.settings = Settings(token_cache_ttl=5)
+    await provisioning_manager.generate_workspace_name("test-token")
+    other_instance = WorkspaceManager(provisioning_manager.db)
+    other_instance.settings = Settings(token_cache_ttl=5)
+    other_instance.api_client = AsyncMock()
+
+    assert await other_instance.generate_workspace_name("test-token") == "MCP_1_test"
+    other_instance.api_client.get_token_details.assert_not_called()
+    provisioning_manager.api_client.get_token_details.assert_called_once_with("test-token")
+
+
+@pytest.mark.asyncio
+async def test_verified_token_is_not_cached_by_default(provisioning_manager):
+    await provisioning_manager.generate_workspace_name("test-token")
+    await provisioning_manager.generate_workspace_name("test-token")
+
+    assert provisioning_manager.api_client.get_token_details.call_count == 2